@@ -0,0 +1,341 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import Integer, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.sql import exists, func, select, text
+
+from .models import Claim, ProviderNetFeeTotal
+from .normalize import normalize_claim
+from .schemas import ClaimCreate
+
+logger = logging.getLogger(__name__)
+
+_CLAIM_CREATE_LIST_ADAPTER = TypeAdapter(List[ClaimCreate])
+
+_AMOUNT_COLUMNS = (
+    "provider_fees",
+    "member_coinsurance",
+    "member_copay",
+    "allowed_fees",
+    "net_fee",
+)
+
+
+def prepare_claims(body: bytes) -> List[Claim]:
+    """
+    Parse, normalize and validate a JSON request body containing either a
+    single claim object or a list of claim objects, and build the claims to
+    be inserted.
+
+    This is CPU-bound and does not touch the database, so it can be run in a
+    worker thread.
+
+    Args:
+        body (bytes): The JSON request body.
+
+    Returns:
+        List[Claim]: The claims to be inserted.
+
+    Raises:
+        ValidationError: If any of the claims is invalid.
+    """
+    raw_data = orjson.loads(body)
+    # Normalize keys and values
+    if isinstance(raw_data, list):
+        normalized_data = [normalize_claim(item) for item in raw_data]
+    else:
+        normalized_data = [normalize_claim(raw_data)]
+
+    # Validate normalized data
+    claims = _CLAIM_CREATE_LIST_ADAPTER.validate_python(normalized_data)
+
+    db_claims = []
+    for claim in claims:
+        net_fee = (
+            claim.provider_fees
+            + claim.member_coinsurance
+            + claim.member_copay
+            - claim.allowed_fees
+        )
+        db_claims.append(
+            Claim(
+                service_date=claim.service_date,
+                submitted_procedure=claim.submitted_procedure,
+                quadrant=claim.quadrant,
+                plan_group_number=claim.plan_group_number,
+                subscriber_number=claim.subscriber_number,
+                provider_npi=claim.provider_npi,
+                provider_fees=claim.provider_fees,
+                member_coinsurance=claim.member_coinsurance,
+                member_copay=claim.member_copay,
+                allowed_fees=claim.allowed_fees,
+                net_fee=net_fee,
+            )
+        )
+    return db_claims
+
+
+async def insert_claims(session: AsyncSession, db_claims: List[Claim]) -> None:
+    """
+    Insert claims with a bulk INSERT ... RETURNING, without tracking them in
+    the session, and set their primary keys from the returned values.
+
+    Args:
+        session (AsyncSession): The database session.
+        db_claims (List[Claim]): The claims to be inserted.
+    """
+    # With no parameters, the INSERT would insert a single row of defaults
+    if not db_claims:
+        return
+    columns = [column for column in Claim.__table__.columns.keys() if column != "id"]
+    result = await session.execute(
+        insert(Claim).returning(Claim.id, sort_by_parameter_order=True),
+        [
+            {column: getattr(db_claim, column) for column in columns}
+            for db_claim in db_claims
+        ],
+    )
+    for db_claim, claim_id in zip(db_claims, result.scalars()):
+        db_claim.id = claim_id
+
+
+async def copy_claims(session: AsyncSession, db_claims: List[Claim]) -> None:
+    """
+    Insert claims using PostgreSQL's COPY protocol.
+
+    COPY cannot return generated values, so the primary keys are first reserved
+    from the table's sequence and then copied along with the other columns.
+
+    Args:
+        session (AsyncSession): The database session.
+        db_claims (List[Claim]): The claims to be inserted.
+    """
+    conn = await session.connection()
+    result = await conn.execute(
+        text(
+            "SELECT nextval(pg_get_serial_sequence(:table, 'id'))"
+            " FROM generate_series(1, :n)"
+        ),
+        {"table": Claim.__tablename__, "n": len(db_claims)},
+    )
+    for db_claim, (claim_id,) in zip(db_claims, result):
+        db_claim.id = claim_id
+
+    columns = list(Claim.__table__.columns.keys())
+    raw_conn = await conn.get_raw_connection()
+    await raw_conn.driver_connection.copy_records_to_table(
+        Claim.__tablename__,
+        records=[
+            tuple(getattr(db_claim, column) for column in columns)
+            for db_claim in db_claims
+        ],
+        columns=columns,
+    )
+
+
+async def add_provider_net_fees(session: AsyncSession, db_claims: List[Claim]) -> None:
+    """
+    Add the net fees of claims to the running totals per provider, in the same
+    transaction as the claims themselves.
+
+    Args:
+        session (AsyncSession): The database session.
+        db_claims (List[Claim]): The claims being inserted.
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for db_claim in db_claims:
+        totals[db_claim.provider_npi] += db_claim.net_fee
+    if not totals:
+        return
+
+    # Rows are upserted in a consistent order to avoid deadlocks between
+    # concurrent transactions
+    statement = insert(ProviderNetFeeTotal).values(
+        [
+            {"provider_npi": provider_npi, "total_net_fee": total_net_fee}
+            for provider_npi, total_net_fee in sorted(totals.items())
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProviderNetFeeTotal.provider_npi],
+        set_={
+            "total_net_fee": ProviderNetFeeTotal.total_net_fee
+            + statement.excluded.total_net_fee
+        },
+    )
+    await session.execute(statement)
+
+
+async def check_claim_schema(conn: AsyncConnection) -> None:
+    """
+    Check that the claim table stores monetary amounts as integer cents.
+
+    Earlier versions stored them as NUMERIC dollars, and `create_all` does not
+    alter existing tables, so claims would otherwise be written in cents next
+    to claims in dollars.
+
+    Args:
+        conn (AsyncConnection): The database connection.
+
+    Raises:
+        RuntimeError: If a monetary column of the claim table is not an integer.
+    """
+    columns = await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).get_columns(Claim.__tablename__)
+    )
+    for column in columns:
+        if column["name"] in _AMOUNT_COLUMNS and not isinstance(
+            column["type"], Integer
+        ):
+            raise RuntimeError(
+                f"Column {Claim.__tablename__}.{column['name']} has type"
+                f" {column['type']}, but amounts are now stored as BIGINT cents;"
+                " the database was created by an earlier version and must be"
+                " recreated, e.g. with `docker-compose down -v`"
+            )
+
+
+async def backfill_provider_net_fees(conn: AsyncConnection) -> None:
+    """
+    Compute the running totals per provider from the existing claims, if no
+    totals have been recorded yet.
+
+    Args:
+        conn (AsyncConnection): The database connection.
+    """
+    await conn.execute(
+        insert(ProviderNetFeeTotal).from_select(
+            ["provider_npi", "total_net_fee"],
+            select(Claim.provider_npi, func.sum(Claim.net_fee))
+            .where(~exists(select(ProviderNetFeeTotal.provider_npi)))
+            .group_by(Claim.provider_npi),
+        )
+    )
+
+
+class ClaimInsertBuffer:
+    """
+    Buffer that collects claims from concurrent requests and inserts them
+    together, trading a little latency for far fewer transactions under
+    bursty load.
+
+    A background task waits for the first batch of claims, keeps collecting
+    batches until either `max_rows` claims are buffered or `wait_ms`
+    milliseconds have passed, and then inserts all of them with a single COPY
+    in one transaction. If the task ever stops, every claim still waiting to
+    be inserted fails with the error that stopped it.
+
+    Attributes:
+        engine (AsyncEngine): The engine used to insert the claims.
+        max_rows (int): The number of buffered claims that triggers a flush.
+        wait_ms (int): The longest time to wait for more claims before a flush.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_rows: int, wait_ms: int):
+        self.engine = engine
+        self.max_rows = max_rows
+        self.wait_ms = wait_ms
+        self._queue: asyncio.Queue[Tuple[List[Claim], asyncio.Future]] = (
+            asyncio.Queue()
+        )
+        self._batches: List[Tuple[List[Claim], asyncio.Future]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start the background task that flushes the buffer.
+        """
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_done)
+
+    async def stop(self) -> None:
+        """
+        Flush any buffered claims and stop the background task.
+        """
+        await self._queue.join()
+        if self._task:
+            self._task.cancel()
+            # Any error that stopped the task has already been logged
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def insert(self, db_claims: List[Claim]) -> None:
+        """
+        Insert claims with the next flush of the buffer, waiting until they
+        are committed. Their primary keys are set when this returns.
+
+        Args:
+            db_claims (List[Claim]): The claims to be inserted.
+
+        Raises:
+            RuntimeError: If the background task is not running.
+            Exception: Any error raised while inserting the flushed claims.
+        """
+        if not self._task or self._task.done():
+            raise RuntimeError("Claim insert buffer is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((db_claims, future))
+        await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batches = [await self._queue.get()]
+            n_rows = len(self._batches[0][0])
+            deadline = loop.time() + self.wait_ms / 1000
+            while n_rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                self._batches.append(batch)
+                n_rows += len(batch[0])
+
+            db_claims = [db_claim for claims, _ in self._batches for db_claim in claims]
+            try:
+                await self._flush(db_claims)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(db_claims)} buffered claim(s)")
+                self._complete(e)
+            else:
+                logger.info(f"Flushed {len(db_claims)} buffered claim(s)")
+                self._complete()
+
+    async def _flush(self, db_claims: List[Claim]) -> None:
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            await copy_claims(session, db_claims)
+            await add_provider_net_fees(session, db_claims)
+            await session.commit()
+
+    def _complete(self, error: Optional[BaseException] = None) -> None:
+        batches, self._batches = self._batches, []
+        for _, future in batches:
+            if not future.done():
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(None)
+            self._queue.task_done()
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        # Fail the claims collected for the next flush and any still queued, so
+        # that neither their requests nor stop() wait for them forever
+        if task.cancelled():
+            error: BaseException = RuntimeError("Claim insert buffer was stopped")
+        else:
+            error = task.exception() or RuntimeError("Claim insert buffer exited")
+            logger.error(f"Claim insert buffer failed: {str(error)}")
+        while not self._queue.empty():
+            self._batches.append(self._queue.get_nowait())
+        self._complete(error)
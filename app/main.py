@@ -1,40 +1,83 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, List
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+import orjson
+from asyncpg.exceptions import UniqueViolationError
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi_limiter import FastAPILimiter
-from fastapi_limiter.depends import RateLimiter
-from pydantic import ValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import func
+from sqlalchemy.orm import raiseload
 from sqlmodel import SQLModel, col
+from starlette.background import BackgroundTask
 
 from .config import engine, settings
-from .models import Claim
-from .normalize import normalize_claim
-from .schemas import ClaimCreate, ClaimRead, ProviderNetFee
+from .ingest import (
+    ClaimInsertBuffer,
+    add_provider_net_fees,
+    backfill_provider_net_fees,
+    check_claim_schema,
+    copy_claims,
+    insert_claims,
+    prepare_claims,
+)
+from .models import Claim, ProviderNetFeeTotal
+from .ratelimit import rate_limiter
+from .schemas import ClaimRead, ProviderNetFee
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_CLAIM_READ_LIST_ADAPTER = TypeAdapter(List[ClaimRead])
+
+TOP_PROVIDER_NPIS_CACHE_KEY = "top-provider-npis"
+"""
+Redis key under which the top provider NPIs are cached, along with the
+generation they were computed in.
+"""
+
+TOP_PROVIDER_NPIS_GENERATION_KEY = "top-provider-npis:generation"
+"""
+Redis key holding the generation of the top provider NPIs, which is incremented
+whenever new claims are created. A cached value from an earlier generation is
+stale.
+"""
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Context manager for application lifespan. It creates the database tables
-    and initializes the rate limiter with Redis.
+    Context manager for application lifespan. It creates the database tables,
+    checks that an existing claim table has the current schema, backfills the
+    provider net fee totals if needed, starts the claim insert buffer if
+    enabled, and connects to Redis, which caches results and, if rate limits
+    are tracked in Redis, backs the rate limiter.
     """
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await check_claim_schema(conn)
+        await backfill_provider_net_fees(conn)
         logger.info("Database tables created")
 
-    # Initialize rate limiter
+    # Start the claim insert buffer
+    app.state.insert_buffer = None
+    if settings.async_insert:
+        app.state.insert_buffer = ClaimInsertBuffer(
+            engine,
+            max_rows=settings.async_insert_max_rows,
+            wait_ms=settings.async_insert_wait_ms,
+        )
+        app.state.insert_buffer.start()
+        logger.info("Claim insert buffer started")
+
+    # Connect to Redis
     redis = Redis(
         host=settings.redis_host,
         port=settings.redis_port,
@@ -42,23 +85,28 @@ async def lifespan(app: FastAPI):
         encoding="utf-8",
         decode_responses=True,
     )
-    await FastAPILimiter.init(redis)
-    logger.info("Rate limiter initialized")
+    app.state.redis = redis
 
     yield
+    if app.state.insert_buffer:
+        await app.state.insert_buffer.stop()
+        logger.info("Claim insert buffer stopped")
     await redis.close()
     logger.info("Redis connection closed")
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 # Dependency to get the session
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency that provides a SQLAlchemy AsyncSession.
+
+    Committed objects are not expired, so their attributes remain readable
+    without reloading them from the database.
     """
-    async with AsyncSession(engine) as session:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
 
 
@@ -76,86 +124,118 @@ async def create_claim(request: Request, session: AsyncSession = Depends(get_ses
         List[ClaimRead]: The created claim(s).
     """
     try:
-        raw_data = await request.json()
-        # Normalize keys and values
-        if isinstance(raw_data, list):
-            normalized_data = [normalize_claim(item) for item in raw_data]
-        else:
-            normalized_data = [normalize_claim(raw_data)]
-
-        claims = []
-        for claim_data in normalized_data:
-            # Validate normalized data
-            claim = ClaimCreate(**claim_data)
-            net_fee = (
-                claim.provider_fees
-                + claim.member_coinsurance
-                + claim.member_copay
-                - claim.allowed_fees
-            )
-            db_claim = Claim(
-                service_date=claim.service_date,
-                submitted_procedure=claim.submitted_procedure,
-                quadrant=claim.quadrant,
-                plan_group_number=claim.plan_group_number,
-                subscriber_number=claim.subscriber_number,
-                provider_npi=claim.provider_npi,
-                provider_fees=claim.provider_fees,
-                member_coinsurance=claim.member_coinsurance,
-                member_copay=claim.member_copay,
-                allowed_fees=claim.allowed_fees,
-                net_fee=net_fee,
-            )
-            session.add(db_claim)
-            try:
+        # Parse, normalize and validate the claims in a worker thread, so that
+        # large payloads do not block the event loop
+        db_claims = await asyncio.to_thread(prepare_claims, await request.body())
+        if not db_claims:
+            return Response(content=b"[]", media_type="application/json")
+
+        # Insert all claims in a single transaction along with the updated
+        # provider net fee totals, either buffered with those of concurrent
+        # requests, using COPY for large batches, or using a bulk INSERT whose
+        # RETURNING clause provides the primary keys
+        insert_buffer = request.app.state.insert_buffer
+        try:
+            if insert_buffer:
+                await insert_buffer.insert(db_claims)
+            else:
+                if len(db_claims) >= settings.copy_threshold:
+                    await copy_claims(session, db_claims)
+                else:
+                    await insert_claims(session, db_claims)
+                await add_provider_net_fees(session, db_claims)
                 await session.commit()
-                await session.refresh(db_claim)
-                claims.append(db_claim)
-                logger.info(f"Claim {db_claim.id} created successfully")
-            except IntegrityError:
-                await session.rollback()
-                logger.error(
-                    f"Claim creation failed: claim {db_claim.id} already exists"
-                )
-                raise HTTPException(
-                    status_code=400, detail="Claim with this ID already exists"
-                )
-        # Eagerly load attributes for each claim
-        for claim in claims:
-            await session.refresh(
-                claim,
-                attribute_names=[
-                    attr for attr in claim.__dict__.keys() if not attr.startswith("_")
-                ],
+        except (IntegrityError, UniqueViolationError):
+            await session.rollback()
+            logger.error("Claim creation failed: claim already exists")
+            raise HTTPException(
+                status_code=400, detail="Claim with this ID already exists"
             )
-        return claims
+        logger.info(f"{len(db_claims)} claim(s) created successfully")
+
+        # Invalidate the cached top provider NPIs, which may have changed; if
+        # this fails, the cached value still expires shortly
+        try:
+            await request.app.state.redis.incr(TOP_PROVIDER_NPIS_GENERATION_KEY)
+        except RedisError as e:
+            logger.warning(f"Failed to invalidate top provider NPIs: {str(e)}")
+
+        # Build the response from the in-memory claims, whose columns were all
+        # set before the insert and whose primary keys were populated by it
+        claims_read = _CLAIM_READ_LIST_ADAPTER.validate_python(db_claims)
+        return Response(
+            content=_CLAIM_READ_LIST_ADAPTER.dump_json(claims_read),
+            media_type="application/json",
+        )
     except ValidationError as e:
         raise RequestValidationError(e.errors())
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@app.get("/claims", response_model=List[ClaimRead])
-async def get_claims(session: AsyncSession = Depends(get_session)):
+async def stream_claims(
+    session: AsyncSession, results: AsyncResult
+) -> AsyncGenerator[bytes, None]:
     """
-    Retrieve all claims.
+    Stream claims as a JSON array, serializing them in batches as they are
+    fetched from the database. The session is closed when streaming ends.
 
     Args:
         session (AsyncSession): The database session.
+        results (AsyncResult): The streamed claims.
+
+    Yields:
+        bytes: The next chunk of the JSON array.
+    """
+    try:
+        yield b"["
+        separator = b""
+        async for partition in results.scalars().partitions():
+            claims = _CLAIM_READ_LIST_ADAPTER.validate_python(partition)
+            yield separator + _CLAIM_READ_LIST_ADAPTER.dump_json(claims)[1:-1]
+            separator = b","
+        yield b"]"
+        logger.info("Claims retrieved successfully")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        raise
+    finally:
+        await session.close()
+
+
+@app.get("/claims", response_model=List[ClaimRead])
+async def get_claims():
+    """
+    Retrieve all claims. The claims are fetched with a server-side cursor and
+    streamed in batches, so they are never all held in memory at once.
 
     Returns:
         List[ClaimRead]: The list of all claims.
     """
+    # The session must outlive this function, since the claims are fetched
+    # while the response is being sent
+    session = AsyncSession(engine)
     try:
-        statement = select(Claim).options(selectinload("*"))
-        results = await session.execute(statement)
-        claims = results.scalars().all()
-        logger.info("Claims retrieved successfully")
-        return claims
+        statement = (
+            select(Claim)
+            .options(raiseload("*"))
+            .execution_options(yield_per=settings.stream_batch_size)
+        )
+        results = await session.stream(statement)
     except Exception as e:
+        await session.close()
         logger.error(f"An unexpected error occurred: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    # The session is also closed in a background task, which runs even if the
+    # client disconnects before streaming starts
+    return StreamingResponse(
+        stream_claims(session, results),
+        media_type="application/json",
+        background=BackgroundTask(session.close),
+    )
 
 
 @app.get("/claims/{id}", response_model=ClaimRead)
@@ -171,7 +251,7 @@ async def get_claim(id: int, session: AsyncSession = Depends(get_session)):
         ClaimRead: The requested claim.
     """
     try:
-        statement = select(Claim).where(col(Claim.id) == id).options(selectinload("*"))
+        statement = select(Claim).where(col(Claim.id) == id).options(raiseload("*"))
         result = await session.execute(statement)
         claim = result.scalar_one_or_none()
         if not claim:
@@ -191,38 +271,70 @@ async def get_claim(id: int, session: AsyncSession = Depends(get_session)):
     response_model=List[ProviderNetFee],
     dependencies=[
         Depends(
-            RateLimiter(
+            rate_limiter(
                 times=settings.rate_limit_times, seconds=settings.rate_limit_seconds
             )
         )
     ],
 )
-async def get_top_provider_npis(session: AsyncSession = Depends(get_session)):
+async def get_top_provider_npis(
+    request: Request, session: AsyncSession = Depends(get_session)
+):
     """
-    Retrieve the top 10 provider NPIs by total net fees generated.
+    Retrieve the top 10 provider NPIs by total net fees generated, from the
+    running totals kept up to date as claims are inserted. The result is cached
+    in Redis for a few seconds, or until new claims are created. If Redis is
+    unavailable, the result is computed without caching it.
 
     Args:
+        request (Request): The request object.
         session (AsyncSession): The database session.
 
     Returns:
         List[ProviderNetFee]: The list of top provider NPIs by net fees.
     """
     try:
-        statement = (
-            select(
-                col(Claim.provider_npi), func.sum(Claim.net_fee).label("total_net_fee")
+        # The generation is read before querying the database, so that a result
+        # computed before new claims were committed is cached under the earlier
+        # generation and is never served after they are
+        redis = request.app.state.redis
+        try:
+            generation, cached = await redis.mget(
+                TOP_PROVIDER_NPIS_GENERATION_KEY, TOP_PROVIDER_NPIS_CACHE_KEY
             )
-            .group_by(Claim.provider_npi)
-            .order_by(func.sum(Claim.net_fee).desc())
+        except RedisError as e:
+            logger.warning(f"Failed to read cached top provider NPIs: {str(e)}")
+            redis = None
+        else:
+            if cached is not None:
+                cached = orjson.loads(cached)
+                if cached["generation"] == generation:
+                    logger.info("Top provider NPIs retrieved from cache")
+                    return cached["top_providers"]
+
+        statement = (
+            select(ProviderNetFeeTotal)
+            .order_by(col(ProviderNetFeeTotal.total_net_fee).desc())
             .limit(10)
         )
         results = await session.execute(statement)
-        top_providers = results.all()
-        logger.info("Top provider NPIs retrieved successfully")
-        return [
+        top_providers = [
             {"provider_npi": row.provider_npi, "total_net_fee": row.total_net_fee}
-            for row in top_providers
+            for row in results.scalars().all()
         ]
+        if redis:
+            try:
+                await redis.set(
+                    TOP_PROVIDER_NPIS_CACHE_KEY,
+                    orjson.dumps(
+                        {"generation": generation, "top_providers": top_providers}
+                    ),
+                    ex=settings.top_provider_npis_cache_seconds,
+                )
+            except RedisError as e:
+                logger.warning(f"Failed to cache top provider NPIs: {str(e)}")
+        logger.info("Top provider NPIs retrieved successfully")
+        return top_providers
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
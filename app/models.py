@@ -1,13 +1,16 @@
 from datetime import date
-from decimal import Decimal
 from typing import Optional
 
+from sqlalchemy import BigInteger, Index
 from sqlmodel import Field, SQLModel
 
 
 class Claim(SQLModel, table=True):
     """
-    Database model for a claim.
+    Database model for a claim. Monetary amounts are stored as integer cents.
+
+    Claims are indexed by provider NPI together with net fee, so that net fees
+    can be summed per provider from the index alone.
 
     Attributes:
         id (Optional[int]): The primary key for the claim.
@@ -17,22 +20,40 @@ class Claim(SQLModel, table=True):
         plan_group_number (str): The plan/group number associated with the claim.
         subscriber_number (str): The subscriber number associated with the claim.
         provider_npi (str): The National Provider Identifier (NPI) for the provider.
-        provider_fees (Decimal): The fees charged by the provider.
-        member_coinsurance (Decimal): The coinsurance amount paid by the member.
-        member_copay (Decimal): The copay amount paid by the member.
-        allowed_fees (Decimal): The allowed fees for the procedure.
-        net_fee (Decimal): The net fee calculated for the claim.
+        provider_fees (int): The fees charged by the provider, in cents.
+        member_coinsurance (int): The coinsurance amount paid by the member, in cents.
+        member_copay (int): The copay amount paid by the member, in cents.
+        allowed_fees (int): The allowed fees for the procedure, in cents.
+        net_fee (int): The net fee calculated for the claim, in cents.
     """
 
+    __table_args__ = (Index("ix_claim_npi_net_fee", "provider_npi", "net_fee"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     service_date: date
     submitted_procedure: str = Field(index=True)
     quadrant: Optional[str] = Field(default=None)
-    plan_group_number: str = Field(index=True)
-    subscriber_number: str = Field(index=True)
-    provider_npi: str = Field(index=True)
-    provider_fees: Decimal
-    member_coinsurance: Decimal
-    member_copay: Decimal
-    allowed_fees: Decimal
-    net_fee: Decimal = Field(default=Decimal("0.0"))
+    plan_group_number: str
+    subscriber_number: str
+    provider_npi: str
+    provider_fees: int = Field(sa_type=BigInteger)
+    member_coinsurance: int = Field(sa_type=BigInteger)
+    member_copay: int = Field(sa_type=BigInteger)
+    allowed_fees: int = Field(sa_type=BigInteger)
+    net_fee: int = Field(default=0, sa_type=BigInteger)
+
+
+class ProviderNetFeeTotal(SQLModel, table=True):
+    """
+    Database model for the running total of net fees per provider, kept up to
+    date as claims are inserted.
+
+    Attributes:
+        provider_npi (str): The National Provider Identifier (NPI) for the provider.
+        total_net_fee (int): The total net fee of the provider's claims, in cents.
+    """
+
+    __tablename__ = "provider_net_fee"
+
+    provider_npi: str = Field(primary_key=True)
+    total_net_fee: int = Field(default=0, index=True, sa_type=BigInteger)
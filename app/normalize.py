@@ -1,25 +1,43 @@
 import re
-from decimal import Decimal
+from datetime import date, datetime
+from decimal import Decimal, DecimalException, InvalidOperation
+from functools import lru_cache
+from typing import Union
 
 from dateutil import parser as date_parser
+from pydantic_core import PydanticKnownError
 
+_NON_WORD_RE = re.compile(r"\W+")
 
+_AMOUNT_RE = re.compile(r"(-?)(\d{1,15})(?:\.(\d{1,2}))?")
+
+_CENT = Decimal("0.01")
+
+_DATE_FORMATS = (
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%y %H:%M",
+    "%Y/%m/%d",
+)
+
+
+@lru_cache(maxsize=512)
 def normalize_key(key: str) -> str:
     """
     Normalize a key by stripping whitespace, replacing '#' with '_number',
     replacing non-word characters with '_', and converting to lowercase.
 
+    Results are cached, since the same few field names recur in every claim.
+
     Args:
         key (str): The key to be normalized.
 
     Returns:
         str: The normalized key.
     """
-    key = key.strip()
-    key = key.replace("#", " number")
-    key = re.sub(r"\W+", "_", key)
-    key = key.lower()
-    return key
+    key = key.strip().replace("#", " number")
+    return _NON_WORD_RE.sub("_", key).lower()
 
 
 def normalize_value(value: str) -> str:
@@ -38,6 +56,102 @@ def normalize_value(value: str) -> str:
     return value
 
 
+def parse_date(value: str) -> date:
+    """
+    Parse a date string, trying ISO 8601 and a few common layouts before
+    falling back to the much slower generic parser from dateutil.
+
+    Args:
+        value (str): The date string to be parsed.
+
+    Returns:
+        date: The parsed date.
+
+    Raises:
+        ValueError: If the value cannot be parsed as a date.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    return date_parser.parse(value).date()
+
+
+def parse_cents(
+    amount: Union[str, int, float], *, min_cents: int, max_cents: int
+) -> int:
+    """
+    Parse a monetary amount in dollars into an integer number of cents, within
+    the given bounds.
+
+    Plain amounts with at most two decimal places are parsed with integer
+    arithmetic alone; anything else, such as exponent notation, is parsed as
+    a Decimal. Its bounds are checked before it is converted, so that an
+    amount like "1e999999" is rejected without building a huge integer.
+    Errors are raised with the same types as pydantic's own Decimal
+    validation, so that they describe the amount in dollars.
+
+    Args:
+        amount (Union[str, int, float]): The amount in dollars.
+        min_cents (int): The smallest amount allowed, in cents.
+        max_cents (int): The largest amount allowed, in cents.
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        PydanticKnownError: If the amount is not a number, is not a whole
+            number of cents, or is out of bounds.
+    """
+    if isinstance(amount, bool) or not isinstance(amount, (str, int, float)):
+        raise PydanticKnownError("decimal_type")
+    if isinstance(amount, int):
+        total = amount * 100
+    else:
+        if isinstance(amount, float):
+            amount = repr(amount)
+        match = _AMOUNT_RE.fullmatch(amount)
+        if match:
+            sign, dollars, cents = match.groups()
+            total = int(dollars) * 100 + int((cents or "").ljust(2, "0"))
+            if sign:
+                total = -total
+        else:
+            total = _parse_decimal_cents(amount, min_cents, max_cents)
+    if total < min_cents:
+        raise PydanticKnownError("greater_than_equal", {"ge": Decimal(min_cents).scaleb(-2)})
+    if total > max_cents:
+        raise PydanticKnownError("less_than_equal", {"le": Decimal(max_cents).scaleb(-2)})
+    return total
+
+
+def _parse_decimal_cents(amount: str, min_cents: int, max_cents: int) -> int:
+    try:
+        value = Decimal(amount)
+    except InvalidOperation:
+        raise PydanticKnownError("decimal_parsing")
+    if not value.is_finite():
+        raise PydanticKnownError("finite_number")
+    # Out-of-bounds amounts are returned as one cent past the bound they
+    # exceed, to be rejected by parse_cents, without converting them
+    if value < Decimal(min_cents).scaleb(-2):
+        return min_cents - 1
+    if value > Decimal(max_cents).scaleb(-2):
+        return max_cents + 1
+    try:
+        cents = value.quantize(_CENT)
+    except DecimalException:
+        raise PydanticKnownError("decimal_parsing")
+    if cents != value:
+        raise PydanticKnownError("decimal_max_places", {"decimal_places": 2})
+    return int(cents.scaleb(2))
+
+
 def normalize_claim(data: dict) -> dict:
     """
     Normalize a claim dictionary by normalizing its keys and values,
@@ -52,11 +166,7 @@ def normalize_claim(data: dict) -> dict:
     data = {normalize_key(k): normalize_value(v) for k, v in data.items()}
     if isinstance(data["service_date"], str):
         try:
-            data["service_date"] = date_parser.parse(data["service_date"]).date()
+            data["service_date"] = parse_date(data["service_date"])
         except (date_parser.ParserError, ValueError):
             pass
-    data["provider_fees"] = Decimal(data["provider_fees"])
-    data["member_coinsurance"] = Decimal(data["member_coinsurance"])
-    data["member_copay"] = Decimal(data["member_copay"])
-    data["allowed_fees"] = Decimal(data["allowed_fees"])
     return data
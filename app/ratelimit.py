@@ -0,0 +1,156 @@
+import time
+from collections import OrderedDict
+from math import ceil
+from typing import Callable, Dict, List, Literal, Tuple
+
+from fastapi import Request, Response
+from fastapi_limiter import default_identifier, http_default_callback
+
+from .config import settings
+
+
+class LocalRateLimiter:
+    """
+    Dependency that rate limits requests using in-process token buckets, one
+    per client, without a round-trip to Redis.
+
+    Each bucket holds up to `times` tokens and refills continuously at a rate
+    of `times` tokens per `seconds`. The limits are only enforced per process,
+    so this is suitable only for deployments with a single worker.
+
+    Attributes:
+        capacity (int): The maximum number of tokens in a bucket.
+        rate (float): The number of tokens added to a bucket per second.
+        max_clients (int): The maximum number of buckets retained; the least
+            recently used buckets are evicted first.
+    """
+
+    def __init__(self, times: int, seconds: int, max_clients: int = 10000):
+        self.capacity = times
+        self.rate = times / seconds
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    async def __call__(self, request: Request, response: Response):
+        key = await default_identifier(request)
+
+        # No lock is needed, since nothing here yields to the event loop
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        if not allowed:
+            pexpire = ceil((1 - tokens) / self.rate * 1000)
+            return await http_default_callback(request, response, pexpire)
+
+
+class MultiRateLimiter:
+    """
+    Dependency that enforces several Redis-backed rate limits, sending the
+    commands for all of them to Redis in a single pipelined round-trip.
+
+    Each limit is a fixed window given as a `(scope, times, seconds)` tuple,
+    where scope is "ip" for a limit per client or "global" for a limit shared
+    by all clients. Limits apply per route, so all the paths matched by a route
+    with path parameters share them. The resulting counts are stored on
+    `request.state.rate_limits`, keyed by Redis key, so that limits already
+    checked during a request are not sent to Redis again.
+
+    The Redis client is taken from `request.app.state.redis`.
+
+    Attributes:
+        limits (List[Tuple[str, int, int]]): The limits to be enforced.
+        prefix (str): The prefix of the Redis keys holding the counts.
+    """
+
+    def __init__(
+        self,
+        limits: List[Tuple[Literal["ip", "global"], int, int]],
+        prefix: str = "fastapi-limiter",
+    ):
+        for scope, _, _ in limits:
+            if scope not in ("ip", "global"):
+                raise ValueError(f"Invalid rate limit scope: {scope!r}")
+        self.limits = limits
+        self.prefix = prefix
+
+    async def __call__(self, request: Request, response: Response):
+        redis = getattr(request.app.state, "redis", None)
+        if redis is None:
+            raise RuntimeError("app.state.redis must be set to use MultiRateLimiter")
+        if not hasattr(request.state, "rate_limits"):
+            request.state.rate_limits = {}
+        rate_limits: Dict[str, Tuple[int, int]] = request.state.rate_limits
+
+        route = request.scope["route"].path
+        keys = []
+        for scope, times, seconds in self.limits:
+            if scope == "ip":
+                rate_key = f"{route}:{client_ip(request)}"
+            else:
+                rate_key = route
+            keys.append(f"{self.prefix}:{scope}:{rate_key}:{seconds}")
+
+        pending = [
+            (key, seconds)
+            for key, (_, _, seconds) in zip(keys, self.limits)
+            if key not in rate_limits
+        ]
+        if pending:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, seconds in pending:
+                    pipe.incr(key)
+                    pipe.pexpire(key, seconds * 1000, nx=True)
+                    pipe.pttl(key)
+                results = await pipe.execute()
+            for i, (key, _) in enumerate(pending):
+                count, _, pexpire = results[3 * i : 3 * i + 3]
+                rate_limits[key] = (count, pexpire)
+
+        exceeded = [
+            pexpire
+            for key, (_, times, _) in zip(keys, self.limits)
+            for count, pexpire in [rate_limits[key]]
+            if count > times
+        ]
+        if exceeded:
+            return await http_default_callback(request, response, max(exceeded))
+
+
+def client_ip(request: Request) -> str:
+    """
+    Get the IP address of the client that made a request, as forwarded by a
+    proxy if present.
+
+    Args:
+        request (Request): The request object.
+
+    Returns:
+        str: The client's IP address.
+    """
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0]
+    return request.client.host
+
+
+def rate_limiter(times: int, seconds: int) -> Callable:
+    """
+    Create a rate limiting dependency using the configured backend.
+
+    Args:
+        times (int): The maximum number of requests allowed within the period.
+        seconds (int): The period for rate limiting in seconds.
+
+    Returns:
+        Callable: A `LocalRateLimiter` or a Redis-backed `MultiRateLimiter`.
+    """
+    if settings.rate_limit_backend == "local":
+        return LocalRateLimiter(times=times, seconds=seconds)
+    return MultiRateLimiter([("ip", times, seconds)])
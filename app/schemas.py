@@ -1,8 +1,55 @@
 from datetime import date
 from decimal import Decimal
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, BeforeValidator, Field, field_validator
+
+from .normalize import parse_cents
+
+MAX_AMOUNT_CENTS = 1_000_000_000
+"""
+The largest monetary amount accepted for a claim, in cents ($10 million). This
+keeps amounts, and the sums of many claims' net fees per provider, well within
+the range of the database's BIGINT columns.
+"""
+
+
+def from_cents(amount: Union[int, Decimal]) -> Decimal:
+    """
+    Convert a monetary amount in integer cents to dollars.
+
+    Args:
+        amount (Union[int, Decimal]): The amount in cents.
+
+    Returns:
+        Decimal: The amount in dollars.
+    """
+    return Decimal(amount).scaleb(-2)
+
+
+def parse_amount(amount: Any) -> int:
+    """
+    Parse and check a monetary amount in dollars, converting it to cents.
+
+    Errors refer to the amount as given in dollars, not to the parsed cents.
+
+    Args:
+        amount (Any): The amount in dollars.
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        PydanticKnownError: If the amount is not a whole number of cents, or is
+            negative or too large.
+    """
+    return parse_cents(amount, min_cents=0, max_cents=MAX_AMOUNT_CENTS)
+
+
+Amount = Annotated[int, BeforeValidator(parse_amount)]
+"""
+A monetary amount given in dollars and validated into integer cents.
+"""
 
 
 class ClaimBase(BaseModel):
@@ -16,10 +63,6 @@ class ClaimBase(BaseModel):
         plan_group_number (str): The plan/group number associated with the claim.
         subscriber_number (str): The subscriber number associated with the claim.
         provider_npi (Annotated[str, Field]): The National Provider Identifier (NPI) for the provider.
-        provider_fees (Annotated[Decimal, Field]): The fees charged by the provider.
-        member_coinsurance (Annotated[Decimal, Field]): The coinsurance amount paid by the member.
-        member_copay (Annotated[Decimal, Field]): The copay amount paid by the member.
-        allowed_fees (Annotated[Decimal, Field]): The allowed fees for the procedure.
     """
 
     service_date: date
@@ -30,39 +73,64 @@ class ClaimBase(BaseModel):
     provider_npi: Annotated[
         str, Field(min_length=10, max_length=10, pattern=r"^\d{10}$")
     ]
-    provider_fees: Annotated[Decimal, Field(ge=0, decimal_places=2)]
-    member_coinsurance: Annotated[Decimal, Field(ge=0, decimal_places=2)]
-    member_copay: Annotated[Decimal, Field(ge=0, decimal_places=2)]
-    allowed_fees: Annotated[Decimal, Field(ge=0, decimal_places=2)]
 
 
 class ClaimCreate(ClaimBase):
     """
-    Schema for creating a new claim.
+    Schema for creating a new claim. Monetary amounts are given in dollars and
+    parsed into cents.
+
+    Attributes:
+        provider_fees (Amount): The fees charged by the provider.
+        member_coinsurance (Amount): The coinsurance amount paid by the member.
+        member_copay (Amount): The copay amount paid by the member.
+        allowed_fees (Amount): The allowed fees for the procedure.
     """
 
-    pass
+    provider_fees: Amount
+    member_coinsurance: Amount
+    member_copay: Amount
+    allowed_fees: Amount
 
 
 class ClaimRead(ClaimBase):
     """
-    Schema for reading a claim.
+    Schema for reading a claim. Monetary amounts are read from the database in
+    cents and exposed in dollars.
 
     Attributes:
+        provider_fees (Annotated[Decimal, Field]): The fees charged by the provider.
+        member_coinsurance (Annotated[Decimal, Field]): The coinsurance amount paid by the member.
+        member_copay (Annotated[Decimal, Field]): The copay amount paid by the member.
+        allowed_fees (Annotated[Decimal, Field]): The allowed fees for the procedure.
         id (int): The primary key for the claim.
         net_fee (Decimal): The net fee calculated for the claim.
     """
 
+    provider_fees: Annotated[Decimal, Field(ge=0, decimal_places=2)]
+    member_coinsurance: Annotated[Decimal, Field(ge=0, decimal_places=2)]
+    member_copay: Annotated[Decimal, Field(ge=0, decimal_places=2)]
+    allowed_fees: Annotated[Decimal, Field(ge=0, decimal_places=2)]
     id: int
     net_fee: Decimal
 
+    _from_cents = field_validator(
+        "provider_fees",
+        "member_coinsurance",
+        "member_copay",
+        "allowed_fees",
+        "net_fee",
+        mode="before",
+    )(from_cents)
+
     class Config:
         from_attributes = True
 
 
 class ProviderNetFee(BaseModel):
     """
-    Schema for provider net fee summary.
+    Schema for provider net fee summary. The total net fee is read from the
+    database in cents and exposed in dollars.
 
     Attributes:
         provider_npi (Annotated[str, Field]): The National Provider Identifier (NPI) for the provider.
@@ -73,3 +141,5 @@ class ProviderNetFee(BaseModel):
         str, Field(min_length=10, max_length=10, pattern=r"^\d{10}$")
     ]
     total_net_fee: Annotated[Decimal, Field(ge=0, decimal_places=2)]
+
+    _from_cents = field_validator("total_net_fee", mode="before")(from_cents)
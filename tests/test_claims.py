@@ -242,3 +242,215 @@ async def test_post_claims_multiple_npis(api_url):
             Decimal(top_providers[0]["total_net_fee"])
             == Decimal("1000") + 140 + 20 + 10 - 50
         )
+
+
+@pytest.mark.asyncio
+async def test_post_claims_bulk(api_url):
+    """
+    Test posting a batch of claims large enough to be inserted with COPY.
+
+    This test sends a POST request to create many claims at once, verifies that
+    each returned claim has a distinct ID, and then uses GET requests to verify
+    that the claims were created correctly.
+
+    Args:
+        api_url (str): The base URL of the API.
+    """
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        n_claims_before = len(claims)
+
+        claims_data = [
+            {
+                "service_date": "2024-06-24",
+                "submitted_procedure": "D1234",
+                "quadrant": "UR",
+                "plan_group_number": "ABC123",
+                "subscriber_number": f"SUB{i:06d}",
+                "provider_npi": "1357924680",
+                "provider_fees": "50.00",
+                "member_coinsurance": "0.00",
+                "member_copay": "0.00",
+                "allowed_fees": "50.00",
+            }
+            for i in range(250)
+        ]
+        response = await client.post("/claims", json=claims_data)
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        assert len(claims) == len(claims_data)
+        assert len({claim["id"] for claim in claims}) == len(claims_data)
+
+        response = await client.get(f"/claims/{claims[-1]['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == claims[-1]
+
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        assert len(claims) == n_claims_before + len(claims_data)
+
+
+@pytest.mark.asyncio
+async def test_post_claim_amount_too_large(api_url):
+    """
+    Test posting a single claim with an amount too large to be stored.
+
+    This test sends a POST request to create a new claim with a huge provider fee,
+    verifies that it is rejected as invalid, and then uses GET requests to verify
+    that the claim was not created.
+
+    Args:
+        api_url (str): The base URL of the API.
+    """
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        n_claims_before = len(claims)
+
+        claim_data = {
+            "service_date": "2024-06-24",
+            "submitted_procedure": "D1234",
+            "quadrant": "UR",
+            "plan_group_number": "ABC123",
+            "subscriber_number": "SUB123456",
+            "provider_npi": "5678901234",
+            "provider_fees": "1e20",
+            "member_coinsurance": 20.0,
+            "member_copay": 10.0,
+            "allowed_fees": 50.0,
+        }
+        response = await client.post("/claims", json=claim_data)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        assert len(claims) == n_claims_before
+
+
+@pytest.mark.asyncio
+async def test_post_claim_amount_formats(api_url):
+    """
+    Test posting a single claim with amounts in various valid formats.
+
+    This test sends a POST request to create a new claim with amounts given in
+    exponent notation, with a dollar sign and whitespace, as an integer and as
+    a float, and verifies that the amounts are stored to the cent.
+
+    Args:
+        api_url (str): The base URL of the API.
+    """
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        claim_data = {
+            "service_date": "2024-06-24",
+            "submitted_procedure": "D1234",
+            "quadrant": "UR",
+            "plan_group_number": "ABC123",
+            "subscriber_number": "SUB123456",
+            "provider_npi": "6789012345",
+            "provider_fees": "1.5e2",
+            "member_coinsurance": " $12.34 ",
+            "member_copay": 10,
+            "allowed_fees": 116.85,
+        }
+        response = await client.post("/claims", json=claim_data)
+        assert response.status_code == status.HTTP_200_OK
+        claim = response.json()[0]
+        assert claim["provider_fees"] == "150.00"
+        assert claim["member_coinsurance"] == "12.34"
+        assert claim["member_copay"] == "10.00"
+        assert claim["allowed_fees"] == "116.85"
+        assert claim["net_fee"] == "55.49"
+
+        response = await client.get(f"/claims/{claim['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == claim
+
+
+@pytest.mark.asyncio
+async def test_post_claim_invalid_amounts(api_url):
+    """
+    Test posting claims with amounts that are negative, not whole cents, or
+    out of range.
+
+    This test sends POST requests to create claims with a negative amount,
+    a sub-cent amount given as a string and as a float, amounts in exponent
+    notation with a sub-cent part, and amounts in exponent notation far too
+    large to be stored, and verifies that each is rejected with an error
+    describing the amount as given in dollars.
+
+    Args:
+        api_url (str): The base URL of the API.
+    """
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        n_claims_before = len(claims)
+
+        claim_data = {
+            "service_date": "2024-06-24",
+            "submitted_procedure": "D1234",
+            "quadrant": "UR",
+            "plan_group_number": "ABC123",
+            "subscriber_number": "SUB123456",
+            "provider_npi": "7890123456",
+            "provider_fees": 100.0,
+            "member_coinsurance": 20.0,
+            "member_copay": 10.0,
+            "allowed_fees": 50.0,
+        }
+        for amount, error_type in [
+            (-100.0, "greater_than_equal"),
+            ("100.001", "decimal_max_places"),
+            (0.1 + 0.2, "decimal_max_places"),
+            ("1.2345e1", "decimal_max_places"),
+            ("1e999990", "less_than_equal"),
+            ("1e999999999", "less_than_equal"),
+            ("1e-999999999", "decimal_max_places"),
+        ]:
+            response = await client.post(
+                "/claims", json={**claim_data, "provider_fees": amount}
+            )
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+            (error,) = response.json()["detail"]
+            assert error["loc"] == [0, "provider_fees"]
+            assert error["type"] == error_type
+            assert error["input"] == amount
+
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        assert len(claims) == n_claims_before
+
+
+@pytest.mark.asyncio
+async def test_post_claims_empty(api_url):
+    """
+    Test posting an empty list of claims.
+
+    This test sends a POST request with an empty list of claims, verifies that
+    the response is an empty list, and then uses GET requests to verify that no
+    claims were created.
+
+    Args:
+        api_url (str): The base URL of the API.
+    """
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        n_claims_before = len(claims)
+
+        response = await client.post("/claims", json=[])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+        response = await client.get("/claims")
+        assert response.status_code == status.HTTP_200_OK
+        claims = response.json()
+        assert len(claims) == n_claims_before
@@ -0,0 +1,186 @@
+import asyncio
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from asyncpg.exceptions import NotNullViolationError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlmodel import col
+
+from app.ingest import ClaimInsertBuffer
+from app.models import Claim
+
+
+@pytest_asyncio.fixture
+async def engine(database_url):
+    """
+    Fixture to provide an engine connected to the database used by the API.
+
+    Args:
+        database_url (str): The URL for the database.
+
+    Yields:
+        AsyncEngine: The engine.
+    """
+    engine = create_async_engine(database_url)
+    yield engine
+    await engine.dispose()
+
+
+def make_claims(n_claims, **values):
+    """
+    Build claims to be inserted, each with a net fee of zero.
+
+    Args:
+        n_claims (int): The number of claims.
+        **values: Column values overriding the defaults.
+
+    Returns:
+        list: The claims.
+    """
+    defaults = {
+        "service_date": date(2024, 6, 24),
+        "submitted_procedure": "D1234",
+        "quadrant": "UR",
+        "plan_group_number": "ABC123",
+        "subscriber_number": "SUB123456",
+        "provider_npi": "1122334455",
+        "provider_fees": 5000,
+        "member_coinsurance": 0,
+        "member_copay": 0,
+        "allowed_fees": 5000,
+        "net_fee": 0,
+    }
+    return [Claim(**{**defaults, **values}) for _ in range(n_claims)]
+
+
+async def count_claims(engine, claim_ids):
+    """
+    Count the claims in the database with any of the given IDs.
+
+    Args:
+        engine (AsyncEngine): The engine.
+        claim_ids (list): The claim IDs.
+
+    Returns:
+        int: The number of claims found.
+    """
+    async with AsyncSession(engine) as session:
+        result = await session.execute(
+            select(Claim.id).where(col(Claim.id).in_(claim_ids))
+        )
+        return len(result.all())
+
+
+@pytest.mark.asyncio
+async def test_insert_buffer_coalesces_inserts(engine):
+    """
+    Test that claims inserted concurrently are flushed together.
+
+    This test makes several concurrent inserts through a buffer, verifies that
+    they were committed in a single flush, and that every claim's ID was set and
+    the claim was created.
+
+    Args:
+        engine (AsyncEngine): The engine.
+    """
+    buffer = ClaimInsertBuffer(engine, max_rows=1000, wait_ms=100)
+    flushes = []
+    flush = buffer._flush
+
+    async def counting_flush(db_claims):
+        flushes.append(len(db_claims))
+        await flush(db_claims)
+
+    buffer._flush = counting_flush
+    buffer.start()
+    try:
+        batches = [make_claims(n_claims) for n_claims in (1, 2, 3, 4)]
+        await asyncio.gather(*[buffer.insert(batch) for batch in batches])
+    finally:
+        await buffer.stop()
+
+    assert flushes == [10]
+    claim_ids = [db_claim.id for batch in batches for db_claim in batch]
+    assert None not in claim_ids
+    assert len(set(claim_ids)) == len(claim_ids)
+    assert await count_claims(engine, claim_ids) == len(claim_ids)
+
+
+@pytest.mark.asyncio
+async def test_insert_buffer_flush_error(engine):
+    """
+    Test that an error while flushing is raised to every waiting insert.
+
+    This test makes two concurrent inserts that are flushed together, one of
+    which violates a NOT NULL constraint, and verifies that both inserts raise
+    the database error and that neither batch was created.
+
+    Args:
+        engine (AsyncEngine): The engine.
+    """
+    buffer = ClaimInsertBuffer(engine, max_rows=1000, wait_ms=100)
+    buffer.start()
+    try:
+        valid = make_claims(2)
+        invalid = make_claims(1, subscriber_number=None)
+        results = await asyncio.gather(
+            buffer.insert(valid), buffer.insert(invalid), return_exceptions=True
+        )
+    finally:
+        await buffer.stop()
+
+    assert all(isinstance(result, NotNullViolationError) for result in results)
+    assert await count_claims(engine, [db_claim.id for db_claim in valid]) == 0
+
+
+@pytest.mark.asyncio
+async def test_insert_buffer_stop_drains(engine):
+    """
+    Test that stopping a buffer first flushes the claims waiting in it.
+
+    This test queues inserts into a buffer with a long wait, stops the buffer
+    before the wait is over, and verifies that every insert completed.
+
+    Args:
+        engine (AsyncEngine): The engine.
+    """
+    buffer = ClaimInsertBuffer(engine, max_rows=1000, wait_ms=1000)
+    buffer.start()
+    batches = [make_claims(2) for _ in range(3)]
+    inserts = [asyncio.create_task(buffer.insert(batch)) for batch in batches]
+    await asyncio.sleep(0)
+    await buffer.stop()
+
+    assert all(insert.done() and not insert.exception() for insert in inserts)
+    claim_ids = [db_claim.id for batch in batches for db_claim in batch]
+    assert await count_claims(engine, claim_ids) == len(claim_ids)
+
+
+@pytest.mark.asyncio
+async def test_insert_buffer_task_failure(engine):
+    """
+    Test that waiting inserts fail if the buffer's background task fails.
+
+    This test breaks the buffer's background task with an insert it cannot
+    handle, and verifies that the concurrent inserts fail instead of waiting
+    forever, that stopping the buffer does not hang, and that later inserts
+    are rejected.
+
+    Args:
+        engine (AsyncEngine): The engine.
+    """
+    buffer = ClaimInsertBuffer(engine, max_rows=1000, wait_ms=100)
+    buffer.start()
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            buffer.insert(make_claims(1)), buffer.insert(None), return_exceptions=True
+        ),
+        timeout=5,
+    )
+    assert all(isinstance(result, TypeError) for result in results)
+
+    await asyncio.wait_for(buffer.stop(), timeout=5)
+    with pytest.raises(RuntimeError):
+        await buffer.insert(make_claims(1))
@@ -0,0 +1,226 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI, status
+from redis.asyncio import Redis
+
+from app import ratelimit
+from app.ratelimit import LocalRateLimiter, MultiRateLimiter
+
+
+@pytest_asyncio.fixture
+async def redis(redis_url):
+    """
+    Fixture to provide a client for the Redis instance used by the API.
+
+    Args:
+        redis_url (str): The URL for Redis.
+
+    Yields:
+        Redis: The Redis client.
+    """
+    redis = Redis.from_url(redis_url)
+    yield redis
+    await redis.close()
+
+
+def make_app(*limiters, redis=None):
+    """
+    Build an application with a single route protected by rate limiters.
+
+    Args:
+        *limiters (Callable): The rate limiters.
+        redis (Redis): The Redis client used by the rate limiters, if any.
+
+    Returns:
+        FastAPI: The application.
+    """
+    app = FastAPI()
+    app.state.redis = redis
+
+    @app.get(
+        "/items/{item_id}",
+        dependencies=[Depends(limiter) for limiter in limiters],
+    )
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fixture to provide a clock that only advances when told to, in place of
+    the monotonic clock used by LocalRateLimiter.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+
+    Returns:
+        SimpleNamespace: The clock, whose `now` attribute is the current time in
+            seconds.
+    """
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_local_rate_limiter(clock):
+    """
+    Test limiting each client to a number of requests.
+
+    This test sends requests from one client until it is limited, verifies that
+    it is told when to retry, and that another client is not limited.
+
+    Args:
+        clock (SimpleNamespace): The clock used by the rate limiter.
+    """
+    app = make_app(LocalRateLimiter(times=4, seconds=32))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client_a = {"X-Forwarded-For": "10.0.0.1"}
+        for _ in range(4):
+            response = await client.get("/items/1", headers=client_a)
+            assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1", headers=client_a)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "8"
+
+        client_b = {"X-Forwarded-For": "10.0.0.2"}
+        response = await client.get("/items/1", headers=client_b)
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_local_rate_limiter_refill(clock):
+    """
+    Test that a client's allowance refills over time, up to the limit.
+
+    This test exhausts a client's allowance, verifies that it is allowed another
+    request once enough time has passed for one, and that after a long wait it
+    is allowed no more than the limit.
+
+    Args:
+        clock (SimpleNamespace): The clock used by the rate limiter.
+    """
+    app = make_app(LocalRateLimiter(times=4, seconds=32))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(4):
+            response = await client.get("/items/1")
+            assert response.status_code == status.HTTP_200_OK
+
+        clock.now += 4
+        response = await client.get("/items/1")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "4"
+
+        clock.now += 4
+        response = await client.get("/items/1")
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        clock.now += 1000
+        for _ in range(4):
+            response = await client.get("/items/1")
+            assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_local_rate_limiter_eviction(clock):
+    """
+    Test that the least recently seen clients are forgotten first.
+
+    This test sends requests from more clients than the rate limiter retains,
+    and verifies that only the least recently seen client's allowance is
+    forgotten.
+
+    Args:
+        clock (SimpleNamespace): The clock used by the rate limiter.
+    """
+    app = make_app(LocalRateLimiter(times=1, seconds=60, max_clients=2))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client_a = {"X-Forwarded-For": "10.0.0.1"}
+        client_b = {"X-Forwarded-For": "10.0.0.2"}
+        client_c = {"X-Forwarded-For": "10.0.0.3"}
+        response = await client.get("/items/1", headers=client_a)
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1", headers=client_b)
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1", headers=client_a)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        # Client B is now the least recently seen, so it is forgotten
+        response = await client.get("/items/1", headers=client_c)
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/1", headers=client_a)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        response = await client.get("/items/1", headers=client_b)
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_multi_rate_limiter(redis):
+    """
+    Test enforcing a per-client limit and a global limit together.
+
+    This test sends requests from two clients to different paths of the same
+    route, and verifies that each client is limited by its own limit, that
+    both are limited by the shared limit, and that limited requests are told
+    when to retry.
+
+    Args:
+        redis (Redis): The Redis client.
+    """
+    limiter = MultiRateLimiter([("ip", 3, 60), ("global", 5, 60)], prefix=str(uuid4()))
+    app = make_app(limiter, redis=redis)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client_a = {"X-Forwarded-For": "10.0.0.1"}
+        for item_id in range(3):
+            response = await client.get(f"/items/{item_id}", headers=client_a)
+            assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/3", headers=client_a)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) > 0
+
+        client_b = {"X-Forwarded-For": "10.0.0.2"}
+        response = await client.get("/items/4", headers=client_b)
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/5", headers=client_b)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_multi_rate_limiter_counts_once_per_request(redis):
+    """
+    Test that a limit checked by several rate limiters counts once per request.
+
+    This test protects a route with two rate limiters sharing the same limit,
+    and verifies that requests are only limited once that limit is exceeded.
+
+    Args:
+        redis (Redis): The Redis client.
+    """
+    prefix = str(uuid4())
+    app = make_app(
+        MultiRateLimiter([("ip", 2, 60)], prefix=prefix),
+        MultiRateLimiter([("ip", 2, 60), ("global", 10, 60)], prefix=prefix),
+        redis=redis,
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for item_id in range(2):
+            response = await client.get(f"/items/{item_id}")
+            assert response.status_code == status.HTTP_200_OK
+        response = await client.get("/items/2")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS